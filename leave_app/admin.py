@@ -17,6 +17,7 @@
 # admin.site.index_title = "Welcome to Leave Management System"
 
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from django.core.exceptions import ValidationError
 
 from .models import (
@@ -27,37 +28,82 @@ from .models import (
     Holiday,
     LeaveRequest,
 )
-from .services import approve_leave_request
+from .services import approve_leave_request, sync_leave_days
 
 
 admin.site.register(Department)
-admin.site.register(EmployeeProfile)
 admin.site.register(LeaveType)
-admin.site.register(LeaveBalance)
 admin.site.register(Holiday)
 
 
+@admin.register(EmployeeProfile)
+class EmployeeProfileAdmin(admin.ModelAdmin):
+    list_select_related = ("user",)
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        return qs.select_related("user", "department", "manager")
+
+
+@admin.register(LeaveBalance)
+class LeaveBalanceAdmin(admin.ModelAdmin):
+    list_display = ("employee", "leave_type", "year", "allocated", "used", "remaining")
+    list_select_related = ("employee__user", "leave_type")
+    list_filter = ("year", "leave_type")
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request).with_remaining()
+        return qs.select_related("employee__user", "leave_type")
+
+    @admin.display(description="Remaining", ordering="remaining_db")
+    def remaining(self, obj):
+        return obj.remaining_db
+
+
+class LeaveRequestChangeList(ChangeList):
+    def get_queryset(self, request, exclude_parameters=None):
+        # The changelist never shows the free-text columns
+        return (
+            super()
+            .get_queryset(request, exclude_parameters)
+            .defer("reason", "approve_comment")
+        )
+
+
 @admin.register(LeaveRequest)
 class LeaveRequestAdmin(admin.ModelAdmin):
     list_display = ("employee", "leave_type", "start_date", "end_date", "status")
+    list_select_related = ("employee__user", "leave_type")
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        return qs.select_related("employee__user", "leave_type", "approver").defer(
+            "leave_type__description"
+        )
+
+    def get_changelist(self, request, **kwargs):
+        return LeaveRequestChangeList
 
     def save_model(self, request, obj, form, change):
+        # If status changed from PENDING → APPROVED (initial status comes from the form)
+        if (
+            change
+            and form.initial.get("status") == LeaveRequest.STATUS_PENDING
+            and obj.status == LeaveRequest.STATUS_APPROVED
+        ):
+            # Let the service perform the transition and the balance deduction
+            obj.status = LeaveRequest.STATUS_PENDING
+            if set(form.changed_data) - {"status"}:
+                super().save_model(request, obj, form, change)
 
-        if change:
-            old_obj = LeaveRequest.objects.get(pk=obj.pk)
-
-            # If status changed from PENDING → APPROVED
-            if (
-                old_obj.status == LeaveRequest.STATUS_PENDING
-                and obj.status == LeaveRequest.STATUS_APPROVED
-            ):
-                try:
-                    approve_leave_request(old_obj, request.user)
-                    return
-                except ValidationError as e:
-                    self.message_user(request, f"Error: {e}", level="error")
-                    return
+            try:
+                approve_leave_request(obj, request.user)
+            except ValidationError as e:
+                self.message_user(request, f"Error: {e}", level="error")
+            return
 
+        # Any other path to (or edit of) an approved request keeps leave_days right
+        sync_leave_days(obj)
         super().save_model(request, obj, form, change)
 
 # Custom admin titles
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class LeaveAppConfig(AppConfig):
     name = 'leave_app'
+
+    def ready(self):
+        # Cache invalidation receivers
+        from . import signals  # noqa: F401
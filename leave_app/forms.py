@@ -1,5 +1,5 @@
 from django import forms
-from .models import LeaveRequest, Department, LeaveBalance, EmployeeProfile
+from .models import LeaveRequest, Department, LeaveBalance, EmployeeProfile, LeaveType
 from .services import validate_leave_request
 from django.contrib.auth import get_user_model
 
@@ -125,6 +125,17 @@ class HREmployeeCreateForm(forms.Form):
         required=False,
     )
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # Load only the columns needed to render the dropdown options
+        self.fields["department"].queryset = Department.objects.only(
+            "id", "code", "name"
+        )
+        self.fields["manager"].queryset = User.objects.only(
+            "id", "username", "first_name", "last_name"
+        ).order_by("username")
+
 
 class HREmployeeUpdateForm(forms.ModelForm):
     # Fields from User model
@@ -210,6 +221,9 @@ class LeaveRequestForm(forms.ModelForm):
         self.employee_profile = kwargs.pop("employee_profile", None)
         super().__init__(*args, **kwargs)
 
+        self.fields["leave_type"].queryset = LeaveType.objects.only(
+            "id", "name", "code", "allow_half_day", "require_attachment", "is_paid"
+        )
         self.fields["leave_type"].widget.attrs.update(
             {"class": "border p-2 rounded w-full"}
         )
@@ -239,6 +253,7 @@ class LeaveRequestForm(forms.ModelForm):
                 start_date,
                 end_date,
                 half_day,
+                instance=self.instance,
             )
 
         return cleaned
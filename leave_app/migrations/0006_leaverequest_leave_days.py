@@ -0,0 +1,45 @@
+# Generated by Django 6.0 on 2026-10-15 22:40
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def backfill_leave_days(apps, schema_editor):
+    Holiday = apps.get_model("leave_app", "Holiday")
+    LeaveRequest = apps.get_model("leave_app", "LeaveRequest")
+
+    holidays = set(Holiday.objects.values_list("date", flat=True))
+    approved = list(LeaveRequest.objects.filter(status="APPROVED"))
+
+    for leave in approved:
+        if leave.half_day:
+            leave.leave_days = Decimal("0.5")
+            continue
+
+        days = 0
+        current = leave.start_date
+        while current <= leave.end_date:
+            if current.weekday() < 5 and current not in holidays:
+                days += 1
+            current += timedelta(days=1)
+        leave.leave_days = Decimal(days)
+
+    LeaveRequest.objects.bulk_update(approved, ["leave_days"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leave_app', '0005_leavebalance_lb_emp_year_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leaverequest',
+            name='leave_days',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=5, null=True),
+        ),
+        migrations.RunPython(backfill_leave_days, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 6.0 on 2026-10-15 21:42
+
+import django.contrib.postgres.constraints
+import django.contrib.postgres.operations
+import django.contrib.postgres.fields.ranges
+import leave_app.models
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def check_no_overlaps(apps, schema_editor):
+    """Fail with a readable list instead of an IntegrityError from AddConstraint"""
+    LeaveRequest = apps.get_model("leave_app", "LeaveRequest")
+    active = LeaveRequest.objects.filter(status__in=["PENDING", "APPROVED"])
+    overlapping = (
+        active.filter(
+            Exists(
+                active.filter(
+                    employee_id=OuterRef("employee_id"),
+                    start_date__lte=OuterRef("end_date"),
+                    end_date__gte=OuterRef("start_date"),
+                ).exclude(pk=OuterRef("pk"))
+            )
+        )
+        .order_by("employee_id", "start_date")
+        .values_list("pk", "employee_id", "start_date", "end_date")
+    )
+    rows = list(overlapping)
+    if rows:
+        details = "\n".join(
+            f"  request {pk} (employee {employee_id}): {start} - {end}"
+            for pk, employee_id, start, end in rows
+        )
+        raise RuntimeError(
+            "Cannot add lr_no_overlap: these PENDING/APPROVED leave requests "
+            "overlap another request of the same employee. Cancel or reject "
+            f"the duplicates, then re-run migrate.\n{details}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leave_app', '0006_leaverequest_leave_days'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(check_no_overlaps, migrations.RunPython.noop),
+        # Needed for the "=" operator on employee_id inside a GiST index.
+        # CREATE EXTENSION needs a role with that privilege (superuser, or
+        # database owner on PostgreSQL 13+ since btree_gist is trusted); a DBA
+        # can run "CREATE EXTENSION IF NOT EXISTS btree_gist" beforehand instead.
+        django.contrib.postgres.operations.BtreeGistExtension(),
+        migrations.AddConstraint(
+            model_name='leaverequest',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('status__in', ['PENDING', 'APPROVED'])), expressions=[('employee', '='), (leave_app.models.DateRange('start_date', 'end_date', django.contrib.postgres.fields.ranges.RangeBoundary(inclusive_upper=True)), '&&')], name='lr_no_overlap', violation_error_message='Leave request overlaps with existing leave.'),
+        ),
+    ]
@@ -1,7 +1,14 @@
 import os
-import uuid
+import secrets
 from django.utils import timezone
 from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import (
+    DateRangeField,
+    RangeBoundary,
+    RangeOperators,
+)
 from django.db import models
 
 
@@ -47,6 +54,12 @@ class LeaveType(models.Model):
         return f"{self.name} ({self.code})"
 
 
+class LeaveBalanceQuerySet(models.QuerySet):
+    def with_remaining(self):
+        """Annotate remaining_db (allocated - used, computed in the database)"""
+        return self.annotate(remaining_db=models.F("allocated") - models.F("used"))
+
+
 class LeaveBalance(models.Model):
     employee = models.ForeignKey(EmployeeProfile, on_delete=models.CASCADE)
     leave_type = models.ForeignKey(LeaveType, on_delete=models.CASCADE)
@@ -54,8 +67,13 @@ class LeaveBalance(models.Model):
     allocated = models.DecimalField(max_digits=5, decimal_places=2, default=0)
     used = models.DecimalField(max_digits=5, decimal_places=2, default=0)
 
+    objects = LeaveBalanceQuerySet.as_manager()
+
     class Meta:
         unique_together = ("employee", "leave_type", "year")
+        indexes = [
+            models.Index(fields=["employee", "year"], name="lb_emp_year_idx"),
+        ]
 
     @property
     def remaining(self):
@@ -78,21 +96,35 @@ def leave_attachment_upload_to(instance, filename):
     _, ext = os.path.splitext(filename)
     ext = ext.lower()
 
-    employee_code = "unknown"
-    if instance.employee_id and getattr(instance.employee, "employee_code", None):
-        employee_code = instance.employee.employee_code
+    employee_code = None
+    if instance.employee_id:
+        # Use the related profile if already loaded, otherwise fetch only the code
+        if instance._meta.get_field("employee").is_cached(instance):
+            employee_code = instance.employee.employee_code
+        else:
+            employee_code = (
+                EmployeeProfile.objects.filter(pk=instance.employee_id)
+                .values_list("employee_code", flat=True)
+                .first()
+            )
+    employee_code = employee_code or "unknown"
 
     if instance.start_date:
         date_str = instance.start_date.strftime("%Y%m%d")
     else:
         date_str = timezone.now().strftime("%Y%m%d")
 
-    random_suffix = uuid.uuid4().hex[:12]
+    random_suffix = secrets.token_hex(6)
 
     # Path format: leave_attachments/<employee_code>/<YYYYMMDD>_<random>.ext
     return f"leave_attachments/{employee_code}/{date_str}_{random_suffix}{ext}"
 
 
+class DateRange(models.Func):
+    function = "DATERANGE"
+    output_field = DateRangeField()
+
+
 class LeaveRequest(models.Model):
     STATUS_PENDING = "PENDING"
     STATUS_APPROVED = "APPROVED"
@@ -130,12 +162,54 @@ class LeaveRequest(models.Model):
         related_name="approved_leaves",
     )
     approve_comment = models.TextField(blank=True)
+    # Working days of an approved request, written by the approval service and
+    # the admin via services.sync_leave_days (used for reporting aggregates)
+    leave_days = models.DecimalField(
+        max_digits=5, decimal_places=2, null=True, blank=True, editable=False
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     cancelled_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Overlap check in validate_leave_request
+            models.Index(
+                fields=["employee", "status", "start_date", "end_date"],
+                name="lr_emp_status_range_idx",
+            ),
+            # Date-range filters by status (CEO upcoming leave schedule)
+            models.Index(
+                fields=["status", "start_date", "end_date"],
+                name="lr_status_range_idx",
+            ),
+        ]
+        constraints = [
+            # Storage-level guard against overlapping active requests (PostgreSQL)
+            ExclusionConstraint(
+                name="lr_no_overlap",
+                expressions=[
+                    ("employee", RangeOperators.EQUAL),
+                    (
+                        DateRange(
+                            "start_date",
+                            "end_date",
+                            RangeBoundary(inclusive_upper=True),
+                        ),
+                        RangeOperators.OVERLAPS,
+                    ),
+                ],
+                condition=models.Q(status__in=["PENDING", "APPROVED"]),
+                violation_error_message="Leave request overlaps with existing leave.",
+            ),
+        ]
 
     def __str__(self):
         return f"[{self.status}] {self.employee} {self.start_date} - {self.end_date}"
+
+    def clean(self):
+        # Also keeps full_clean() from validating lr_no_overlap on reversed
+        # dates, where DATERANGE() raises a DataError in PostgreSQL
+        if self.start_date and self.end_date and self.end_date < self.start_date:
+            raise ValidationError({"end_date": "End date must be after start date."})
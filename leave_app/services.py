@@ -1,34 +1,171 @@
+import logging
+import threading
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Exists, F
 from django.utils import timezone
-from datetime import timedelta
-from django.core.mail import send_mail
+from datetime import date
+from django.core.mail import EmailMessage, get_connection
 from django.conf import settings
+from django.core.cache import cache
+from bisect import bisect_left, bisect_right
 from decimal import Decimal
 
 
-from .models import LeaveRequest, LeaveBalance, Holiday, LeaveType, EmployeeProfile
+from .models import (
+    Department,
+    EmployeeProfile,
+    Holiday,
+    LeaveBalance,
+    LeaveRequest,
+    LeaveType,
+)
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+# Holidays change rarely; cache them per year in the configured Django cache so
+# every worker sees an invalidation (or at worst the timeout) after an edit
+HOLIDAY_CACHE_TIMEOUT = 60 * 60
+
+
+def _holiday_cache_key(year):
+    return f"holidays:{year}"
+
+
+def _holidays_for_year(year):
+    return cache.get_or_set(
+        _holiday_cache_key(year),
+        lambda: frozenset(
+            Holiday.objects.filter(date__year=year).values_list("date", flat=True)
+        ),
+        HOLIDAY_CACHE_TIMEOUT,
+    )
+
+
+def _weekday_holidays_cache_key(year):
+    return f"holidays:{year}:weekdays"
+
+
+def _weekday_holidays_for_year(year):
+    """Sorted tuple of the year's holidays that fall on Mon-Fri (cached)"""
+    return cache.get_or_set(
+        _weekday_holidays_cache_key(year),
+        lambda: tuple(sorted(d for d in _holidays_for_year(year) if d.weekday() < 5)),
+        HOLIDAY_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_holiday_cache(*years):
+    """Drop the cached holidays of `years` once the current transaction commits"""
+    keys = [
+        key
+        for year in set(years)
+        for key in (_holiday_cache_key(year), _weekday_holidays_cache_key(year))
+    ]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+# The CEO dashboard is the same for every viewer of a year; cache its context
+# under a shared version number that any leave change bumps
+CEO_DASHBOARD_CACHE_TIMEOUT = 5 * 60
+_CEO_DASHBOARD_VERSION_KEY = "ceo_dash:version"
+
+
+def ceo_dashboard_cache_key(year):
+    version = cache.get_or_set(_CEO_DASHBOARD_VERSION_KEY, 1, None)
+    return f"ceo_dash:{version}:{year}"
+
 
+def invalidate_ceo_dashboard_cache():
+    """Drop every cached dashboard year once the current transaction commits"""
 
-def calculate_working_days(start_date, end_date, half_day=False):
+    def bump():
+        try:
+            cache.incr(_CEO_DASHBOARD_VERSION_KEY)
+        except ValueError:
+            pass  # no version yet, so nothing is cached
+
+    transaction.on_commit(bump)
+
+
+def get_holiday_dates(start_date, end_date):
+    """Return holiday dates for every year between start_date and end_date (cached)"""
+    if start_date.year == end_date.year:
+        return _holidays_for_year(start_date.year)
+    years = range(start_date.year, end_date.year + 1)
+    return frozenset().union(*(_holidays_for_year(year) for year in years))
+
+
+def _count_weekdays(start_date, end_date):
+    """Count Mon-Fri days between dates (inclusive) without iterating each day"""
+    total_days = (end_date - start_date).days + 1
+    if total_days <= 0:
+        return 0
+
+    full_weeks, rem = divmod(total_days, 7)
+    first_weekday = start_date.weekday()
+    rem_weekdays = sum(1 for i in range(rem) if (first_weekday + i) % 7 < 5)
+    return full_weeks * 5 + rem_weekdays
+
+
+def _count_weekday_holidays(start_date, end_date):
+    """Count cached Mon-Fri holidays between dates (inclusive) by binary search"""
+    count = 0
+    for year in range(start_date.year, end_date.year + 1):
+        dates = _weekday_holidays_for_year(year)
+        count += bisect_right(dates, end_date) - bisect_left(dates, start_date)
+    return count
+
+
+def _count_working_days(start_date, end_date, holiday_dates=None):
+    """Weekdays between dates (inclusive) minus the weekday holidays among them"""
+    if end_date < start_date:
+        return 0
+
+    if holiday_dates is None:
+        weekday_holidays = _count_weekday_holidays(start_date, end_date)
+    else:
+        weekday_holidays = sum(
+            1 for d in holiday_dates if start_date <= d <= end_date and d.weekday() < 5
+        )
+    return _count_weekdays(start_date, end_date) - weekday_holidays
+
+
+def _is_working_day(day, holiday_dates=None):
+    if day.weekday() >= 5:
+        return False
+    if holiday_dates is None:
+        holiday_dates = _holidays_for_year(day.year)
+    return day not in holiday_dates
+
+
+def calculate_working_days(start_date, end_date, half_day=False, holiday_dates=None):
     """Calculate working days between dates (exclude weekends + holidays)"""
     if half_day:
         return Decimal("0.5")
 
-    days = Decimal("0")
-    current = start_date
-    while current <= end_date:
-        if current.weekday() < 5 and not Holiday.objects.filter(date=current).exists():
-            days += Decimal("1")
-        current += timedelta(days=1)
-    return days
+    # One-day leave (the common case): a single weekday/holiday check
+    if start_date == end_date:
+        return Decimal(int(_is_working_day(start_date, holiday_dates)))
+
+    return Decimal(_count_working_days(start_date, end_date, holiday_dates))
 
 
-def calculate_working_days_by_year(start_date, end_date, half_day=False):
+def calculate_working_days_by_year(
+    start_date, end_date, half_day=False, holiday_dates=None
+):
     """
     Return dict {year: leave_days_in_that_year}
     - Exclude weekends
     - Exclude holidays
     - If half_day == True must be same start and end date and return 0.5
+    - holiday_dates: optional pre-fetched set of holiday dates covering the range
     """
     if half_day:
         if start_date != end_date:
@@ -37,15 +174,21 @@ def calculate_working_days_by_year(start_date, end_date, half_day=False):
             )
         return {start_date.year: Decimal("0.5")}
 
+    if start_date == end_date:
+        if _is_working_day(start_date, holiday_dates):
+            return {start_date.year: Decimal("1")}
+        return {}
+
+    # Split the range at Jan 1 boundaries and count each segment arithmetically
     days_by_year: dict[int, Decimal] = {}
-    current = start_date
-    while current <= end_date:
-        if current.weekday() < 5 and not Holiday.objects.filter(date=current).exists():
-            year = current.year
-            if year not in days_by_year:
-                days_by_year[year] = Decimal("0")
-            days_by_year[year] += Decimal("1")
-        current += timedelta(days=1)
+    for year in range(start_date.year, end_date.year + 1):
+        days = _count_working_days(
+            max(start_date, date(year, 1, 1)),
+            min(end_date, date(year, 12, 31)),
+            holiday_dates,
+        )
+        if days > 0:
+            days_by_year[year] = Decimal(days)
     return days_by_year
 
 
@@ -56,19 +199,12 @@ def validate_leave_request(
     end_date,
     half_day=False,
     instance: LeaveRequest | None = None,
+    holiday_dates=None,
 ):
-    # 1) Check date range
-    if end_date < start_date:
-        raise ValidationError("End date must be after start date.")
-
-    if start_date < timezone.now().date():
-        raise ValidationError("Cannot request leave in the past.")
+    # 1) + 2) Date range and half-day rules
+    _check_dates(leave_type, start_date, end_date, half_day)
 
-    # 2) Check if leave type allows half-day
-    if half_day and not leave_type.allow_half_day:
-        raise ValidationError("This leave type does not allow half-day leave.")
-
-    # 3) Check overlapping leave (pending / approved)
+    # 3) Overlapping leave (pending / approved)
     overlap_qs = LeaveRequest.objects.filter(
         employee=employee_profile,
         status__in=[LeaveRequest.STATUS_PENDING, LeaveRequest.STATUS_APPROVED],
@@ -76,43 +212,167 @@ def validate_leave_request(
         end_date__gte=start_date,
     )
 
-    # Exclude current instance (e.g., during approval)
-    if instance is not None:
+    # Exclude current instance (e.g., during approval or edit)
+    if instance is not None and instance.pk:
         overlap_qs = overlap_qs.exclude(pk=instance.pk)
 
-    if overlap_qs.exists():
-        raise ValidationError("Leave request overlaps with existing leave.")
-
     # 4) Calculate leave days (by year)
-    days_by_year = calculate_working_days_by_year(start_date, end_date, half_day)
+    days_by_year = calculate_working_days_by_year(
+        start_date, end_date, half_day, holiday_dates=holiday_dates
+    )
+
+    # 5) Fetch yearly balances with the overlap check in the same query
+    balances = {}
+    if leave_type.is_paid and days_by_year:
+        balances = {
+            b.year: b
+            for b in LeaveBalance.objects.with_remaining()
+            .filter(
+                employee=employee_profile,
+                leave_type=leave_type,
+                year__in=list(days_by_year),
+            )
+            .annotate(has_overlap=Exists(overlap_qs))
+        }
+
+    if balances:
+        has_overlap = next(iter(balances.values())).has_overlap
+    else:
+        has_overlap = overlap_qs.exists()
 
-    # 5) If unpaid leave, skip quota check
+    if has_overlap:
+        raise ValidationError("Leave request overlaps with existing leave.")
+
+    # 6) If unpaid leave, skip quota check
     if not leave_type.is_paid:
         return sum(days_by_year.values())
 
-    # 6) Check yearly quota
+    # 7) Check yearly quota
+    _check_quota(leave_type, days_by_year, balances)
+
+    return sum(days_by_year.values())
+
+
+def _check_dates(leave_type, start_date, end_date, half_day):
+    if end_date < start_date:
+        raise ValidationError("End date must be after start date.")
+
+    if start_date < timezone.now().date():
+        raise ValidationError("Cannot request leave in the past.")
+
+    if half_day and not leave_type.allow_half_day:
+        raise ValidationError("This leave type does not allow half-day leave.")
+
+
+def _check_quota(leave_type, days_by_year, balances):
+    """balances maps year -> LeaveBalance from LeaveBalance.objects.with_remaining()"""
     for year, days in days_by_year.items():
-        try:
-            balance = LeaveBalance.objects.get(
-                employee=employee_profile,
-                leave_type=leave_type,
-                year=year,
-            )
-        except LeaveBalance.DoesNotExist:
+        balance = balances.get(year)
+        if balance is None:
             raise ValidationError(
                 f"No leave balance for {leave_type.name} in year {year}."
             )
 
-        if days > balance.remaining:
+        if days > balance.remaining_db:
             raise ValidationError(
                 f"Not enough leave balance for {leave_type.name} in {year}. "
-                f"(remaining {balance.remaining}, requested {days})"
+                f"(remaining {balance.remaining_db}, requested {days})"
             )
 
-    return sum(days_by_year.values())
 
+def validate_leave_requests(leave_requests):
+    """
+    Validate a batch of (unsaved or pending) LeaveRequest instances with the
+    same rules as validate_leave_request, using three queries in total
+    (leave types, existing leave, balances; holidays come from the cache).
+    An earlier request in the batch counts as existing leave for later ones.
+    Returns {index in batch: ValidationError} for the requests that fail.
+    """
+    leave_requests = list(leave_requests)
+    leave_types = LeaveType.objects.in_bulk(
+        {lr.leave_type_id for lr in leave_requests if lr.leave_type_id is not None}
+    )
 
-def get_leave_days_for_request(leave_request: LeaveRequest) -> float:
+    # Incomplete requests fail up front and take no part in the queries below
+    errors = {}
+    candidates = []
+    for index, lr in enumerate(leave_requests):
+        if lr.employee_id is None:
+            errors[index] = ValidationError("Employee is required.")
+        elif lr.leave_type_id is None:
+            errors[index] = ValidationError("Leave type is required.")
+        elif lr.leave_type_id not in leave_types:
+            errors[index] = ValidationError("Leave type does not exist.")
+        elif lr.start_date is None or lr.end_date is None:
+            errors[index] = ValidationError("Start and end dates are required.")
+        else:
+            candidates.append((index, lr))
+
+    if not candidates:
+        return errors
+
+    min_start = min(lr.start_date for _, lr in candidates)
+    max_end = max(lr.end_date for _, lr in candidates)
+    employee_ids = {lr.employee_id for _, lr in candidates}
+
+    holiday_dates = get_holiday_dates(min_start, max_end)
+
+    # Pending / approved leave of every employee in the batch
+    existing = defaultdict(list)
+    for pk, employee_id, start_date, end_date in (
+        LeaveRequest.objects.filter(
+            employee_id__in=employee_ids,
+            status__in=[LeaveRequest.STATUS_PENDING, LeaveRequest.STATUS_APPROVED],
+            start_date__lte=max_end,
+            end_date__gte=min_start,
+        )
+        .order_by()
+        .values_list("pk", "employee_id", "start_date", "end_date")
+    ):
+        existing[employee_id].append((pk, start_date, end_date))
+
+    # (employee_id, leave_type_id) -> {year: balance}
+    balances = defaultdict(dict)
+    for b in LeaveBalance.objects.with_remaining().filter(
+        employee_id__in=employee_ids,
+        leave_type_id__in=list(leave_types),
+        year__in=range(min_start.year, max_end.year + 1),
+    ):
+        balances[b.employee_id, b.leave_type_id][b.year] = b
+
+    for index, lr in candidates:
+        leave_type = leave_types[lr.leave_type_id]
+        try:
+            _check_dates(leave_type, lr.start_date, lr.end_date, lr.half_day)
+
+            if any(
+                (lr.pk is None or pk != lr.pk)
+                and start_date <= lr.end_date
+                and end_date >= lr.start_date
+                for pk, start_date, end_date in existing[lr.employee_id]
+            ):
+                raise ValidationError("Leave request overlaps with existing leave.")
+
+            days_by_year = calculate_working_days_by_year(
+                lr.start_date, lr.end_date, lr.half_day, holiday_dates=holiday_dates
+            )
+            if leave_type.is_paid:
+                _check_quota(
+                    leave_type,
+                    days_by_year,
+                    balances[lr.employee_id, lr.leave_type_id],
+                )
+        except ValidationError as e:
+            errors[index] = e
+        else:
+            existing[lr.employee_id].append((lr.pk, lr.start_date, lr.end_date))
+
+    return errors
+
+
+def get_leave_days_for_request(
+    leave_request: LeaveRequest, holiday_dates=None
+) -> float:
     """
     Calculate leave days for an existing leave_request (used during approval)
     """
@@ -120,13 +380,83 @@ def get_leave_days_for_request(leave_request: LeaveRequest) -> float:
         leave_request.start_date,
         leave_request.end_date,
         leave_request.half_day,
+        holiday_dates=holiday_dates,
+    )
+
+
+def sync_leave_days(leave_request: LeaveRequest):
+    """
+    Set leave_days for a request saved outside approve_leave_request
+    (e.g. the admin): the working days if approved, otherwise None
+    """
+    if leave_request.status == LeaveRequest.STATUS_APPROVED:
+        leave_request.leave_days = get_leave_days_for_request(leave_request)
+    else:
+        leave_request.leave_days = None
+
+
+def _set_status_from_pending(
+    leave_request: LeaveRequest, status, approver, comment, **fields
+):
+    """
+    Move a pending request to `status` with a single guarded UPDATE
+    (no prior SELECT); fails if the row is no longer pending.
+    Extra keyword arguments are written in the same UPDATE.
+    """
+    fields.update(
+        status=status,
+        approver=approver,
+        approve_comment=comment,
+        updated_at=timezone.now(),
     )
+    updated = LeaveRequest.objects.filter(
+        pk=leave_request.pk, status=LeaveRequest.STATUS_PENDING
+    ).update(**fields)
+    if not updated:
+        raise ValidationError("This leave request has already been processed.")
+
+    for name, value in fields.items():
+        setattr(leave_request, name, value)
 
+    # update() sends no post_save, so invalidate explicitly
+    invalidate_ceo_dashboard_cache()
 
+
+def _load_related(leave_request: LeaveRequest):
+    """
+    Attach employee, user and leave type in one query unless the caller
+    already loaded them (e.g. via select_related).
+    """
+    if (
+        LeaveRequest._meta.get_field("employee").is_cached(leave_request)
+        and LeaveRequest._meta.get_field("leave_type").is_cached(leave_request)
+        and EmployeeProfile._meta.get_field("user").is_cached(leave_request.employee)
+    ):
+        return
+
+    # Fully loaded: these become the caller's relations
+    related = LeaveRequest.objects.select_related(
+        "employee__user", "leave_type"
+    ).get(pk=leave_request.pk)
+    leave_request.employee = related.employee
+    leave_request.leave_type = related.leave_type
+
+
+@transaction.atomic
 def approve_leave_request(leave_request: LeaveRequest, approver, comment: str = ""):
+    """
+    Approve a pending request and deduct its days from the yearly balances.
+    Runs in one transaction: re-validation, the status change and the
+    balance updates commit together; the email is sent after commit.
+    """
     if leave_request.status != LeaveRequest.STATUS_PENDING:
         raise ValidationError("Only pending requests can be approved.")
 
+    _load_related(leave_request)
+
+    # Fetch holidays once and share them between validation and deduction
+    holiday_dates = get_holiday_dates(leave_request.start_date, leave_request.end_date)
+
     validate_leave_request(
         leave_request.employee,
         leave_request.leave_type,
@@ -134,43 +464,65 @@ def approve_leave_request(leave_request: LeaveRequest, approver, comment: str =
         leave_request.end_date,
         leave_request.half_day,
         instance=leave_request,
+        holiday_dates=holiday_dates,
     )
 
     days_by_year = calculate_working_days_by_year(
         leave_request.start_date,
         leave_request.end_date,
         leave_request.half_day,
+        holiday_dates=holiday_dates,
+    )
+
+    # Status first: the guarded UPDATE makes a second approval fail here
+    _set_status_from_pending(
+        leave_request,
+        LeaveRequest.STATUS_APPROVED,
+        approver,
+        comment,
+        leave_days=sum(days_by_year.values()),
     )
 
-    if leave_request.leave_type.is_paid:
+    if leave_request.leave_type.is_paid and days_by_year:
+        # Lock every affected balance row in one query so concurrent
+        # approvals cannot over-spend them; a fixed (year) order avoids
+        # deadlocks between multi-year approvals
+        balances = {
+            b.year: b
+            for b in LeaveBalance.objects.select_for_update()
+            .filter(
+                employee=leave_request.employee,
+                leave_type=leave_request.leave_type,
+                year__in=list(days_by_year),
+            )
+            .order_by("year")
+        }
+
         for year, days in days_by_year.items():
-            try:
-                balance = LeaveBalance.objects.get(
-                    employee=leave_request.employee,
-                    leave_type=leave_request.leave_type,
-                    year=year,
-                )
-            except LeaveBalance.DoesNotExist:
+            balance = balances.get(year)
+            if balance is None:
                 raise ValidationError("Leave balance not found for this request.")
 
             if days > balance.remaining:
                 raise ValidationError("Insufficient leave balance.")
 
-            balance.used += days
-            balance.save()
-
-    leave_request.status = LeaveRequest.STATUS_APPROVED
-    leave_request.approver = approver
-    leave_request.approve_comment = comment
-    leave_request.updated_at = timezone.now()
-    leave_request.save()
-    print("Leave:", leave_request.leave_type.name)
-    print("Dates:", leave_request.start_date, "-", leave_request.end_date)
-    print("Half day?", leave_request.half_day)
-    print("Days by year:", days_by_year)
-    print("Balance updated:", balance.employee, balance.leave_type, balance.used)
+            balance.used = F("used") + days
+
+        LeaveBalance.objects.bulk_update(balances.values(), ["used"])
+
+    # Delivery is deferred until commit (never sent for a rolled-back approval)
     notify_leave_status_changed(leave_request)
 
+    logger.debug(
+        "Approved leave %s (%s, %s - %s, half day: %s): %s",
+        leave_request.pk,
+        leave_request.leave_type.name,
+        leave_request.start_date,
+        leave_request.end_date,
+        leave_request.half_day,
+        days_by_year,
+    )
+
 
 def reject_leave_request(leave_request: LeaveRequest, approver, comment: str = ""):
     """
@@ -179,11 +531,11 @@ def reject_leave_request(leave_request: LeaveRequest, approver, comment: str = "
     if leave_request.status != LeaveRequest.STATUS_PENDING:
         raise ValidationError("Only pending requests can be rejected.")
 
-    leave_request.status = LeaveRequest.STATUS_REJECTED
-    leave_request.approver = approver
-    leave_request.approve_comment = comment
-    leave_request.updated_at = timezone.now()
-    leave_request.save()
+    _load_related(leave_request)
+
+    _set_status_from_pending(
+        leave_request, LeaveRequest.STATUS_REJECTED, approver, comment
+    )
 
     notify_leave_status_changed(leave_request)
 
@@ -192,41 +544,168 @@ def reject_leave_request(leave_request: LeaveRequest, approver, comment: str = "
 
 
 def create_default_leave_balances(
-    employee_profile: EmployeeProfile, year: int | None = None
-):
+    employee_profile: EmployeeProfile,
+    year: int | None = None,
+    leave_types=None,
+) -> int:
+    """
+    Create any missing default balances for one employee.
+    Pass leave_types when calling in a loop to avoid re-querying LeaveType.
+    """
+    return create_default_leave_balances_for_employees(
+        [employee_profile.pk], year, leave_types=leave_types
+    )
+
+
+def create_default_leave_balances_for_employees(
+    employee_ids, year: int | None = None, leave_types=None
+) -> int:
+    """
+    Create missing default balances for many employees at once.
+    Returns the number of balances created.
+    """
     if year is None:
         year = timezone.now().year
+    if leave_types is None:
+        leave_types = LeaveType.objects.all()
+
+    employee_ids = list(employee_ids)
+    leave_types = list(leave_types)
+    existing = set(
+        LeaveBalance.objects.filter(
+            employee_id__in=employee_ids, year=year
+        ).values_list("employee_id", "leave_type_id")
+    )
 
-    leave_types = LeaveType.objects.all()
-    for lt in leave_types:
-        balance, created = LeaveBalance.objects.get_or_create(
-            employee=employee_profile,
+    to_create = [
+        LeaveBalance(
+            employee_id=employee_id,
             leave_type=lt,
             year=year,
-            defaults={
-                "allocated": Decimal(lt.default_allocation),
-                "used": Decimal("0"),
-            },
+            allocated=Decimal(lt.default_allocation),
+            used=Decimal("0"),
         )
-        if created:
-            print(
-                f"✅ Leave balance created for {employee_profile.user.username} - {lt.name} ({year})"
+        for employee_id in employee_ids
+        for lt in leave_types
+        if (employee_id, lt.id) not in existing
+    ]
+    if to_create:
+        LeaveBalance.objects.bulk_create(
+            to_create, batch_size=1000, ignore_conflicts=True
+        )
+        logger.info(
+            "Created %d default leave balances for %d employees (%d)",
+            len(to_create),
+            len(employee_ids),
+            year,
+        )
+    return len(to_create)
+
+
+@transaction.atomic
+def import_employee_rows(rows):
+    """
+    Create users, departments, profiles and default balances for imported rows
+    using a fixed number of queries (bulk inserts instead of per-row saves).
+    Row format: username, password, employee_code, dept_code, manager_username
+    """
+    rows = [row for row in rows if row[0]]
+    usernames = list(dict.fromkeys(str(row[0]) for row in rows))
+
+    # Users
+    existing_usernames = set(
+        User.objects.filter(username__in=usernames).values_list("username", flat=True)
+    )
+    new_users = {}
+    for username, password, *_ in rows:
+        username = str(username)
+        if username not in existing_usernames and username not in new_users:
+            new_users[username] = User(
+                username=username, password=make_password(str(password or username))
             )
-        else:
-            print(
-                f"ℹ️ Leave balance already exists for {employee_profile.user.username} - {lt.name} ({year})"
+    User.objects.bulk_create(new_users.values(), batch_size=500)
+    users = {u.username: u for u in User.objects.filter(username__in=usernames)}
+
+    # Departments
+    dept_codes = {str(row[3]) for row in rows if row[3]}
+    existing_codes = set(
+        Department.objects.filter(code__in=dept_codes).values_list("code", flat=True)
+    )
+    Department.objects.bulk_create(
+        [Department(code=code, name=code) for code in dept_codes - existing_codes]
+    )
+    departments = {d.code: d for d in Department.objects.filter(code__in=dept_codes)}
+
+    # Managers
+    manager_usernames = {str(row[4]) for row in rows if row[4]}
+    managers = {
+        u.username: u for u in User.objects.filter(username__in=manager_usernames)
+    }
+
+    # Profiles
+    profiled_user_ids = set(
+        EmployeeProfile.objects.filter(
+            user_id__in=[u.id for u in users.values()]
+        ).values_list("user_id", flat=True)
+    )
+    new_profiles = []
+    for username, _, employee_code, dept_code, manager_username in rows:
+        user = users[str(username)]
+        if user.id in profiled_user_ids:
+            continue
+        profiled_user_ids.add(user.id)
+        new_profiles.append(
+            EmployeeProfile(
+                user=user,
+                employee_code=employee_code or f"EMP{user.id:04d}",
+                department=departments.get(str(dept_code)) if dept_code else None,
+                manager=(
+                    managers.get(str(manager_username)) if manager_username else None
+                ),
             )
+        )
+    EmployeeProfile.objects.bulk_create(new_profiles, batch_size=500)
+
+    # Default leave balances for every imported employee
+    profile_ids = EmployeeProfile.objects.filter(
+        user_id__in=[u.id for u in users.values()]
+    ).values_list("id", flat=True)
+    create_default_leave_balances_for_employees(profile_ids)
 
+    # bulk_create sends no post_save
+    invalidate_ceo_dashboard_cache()
 
-def _send_leave_email(subject: str, message: str, to_emails: list[str]):
-    if not to_emails:
+    return len(rows)
+
+
+def _send_leave_emails(emails: list[tuple[str, str, list[str]]]):
+    """
+    Send (subject, message, to_emails) tuples once the current transaction
+    commits, from a background thread so SMTP latency never blocks the
+    response. Messages are fully built by the caller; the thread does no DB work.
+    """
+    emails = [email for email in emails if email[2]]
+    if not emails:
         return
-    send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        to_emails,
-        fail_silently=True,  # prevent errors in production
+
+    def deliver():
+        # One connection, one send_messages() call for the whole batch
+        connection = get_connection(fail_silently=True)  # prevent errors in production
+        connection.send_messages(
+            [
+                EmailMessage(
+                    subject,
+                    message,
+                    settings.DEFAULT_FROM_EMAIL,
+                    to_emails,
+                    connection=connection,
+                )
+                for subject, message, to_emails in emails
+            ]
+        )
+
+    transaction.on_commit(
+        lambda: threading.Thread(target=deliver, daemon=True).start()
     )
 
 
@@ -235,6 +714,8 @@ def notify_leave_submitted(leave_request: LeaveRequest):
     user = emp.user
     manager = emp.manager
 
+    emails = []
+
     if user.email:
         subject = (
             f"Your leave request has been submitted ({leave_request.leave_type.name})"
@@ -245,7 +726,7 @@ def notify_leave_submitted(leave_request: LeaveRequest):
             f"Period: {leave_request.start_date} - {leave_request.end_date}\n"
             f"Current status: {leave_request.get_status_display()}\n"
         )
-        _send_leave_email(subject, message, [user.email])
+        emails.append((subject, message, [user.email]))
 
     if manager and manager.email:
         subject = (
@@ -258,7 +739,9 @@ def notify_leave_submitted(leave_request: LeaveRequest):
             f"Period: {leave_request.start_date} - {leave_request.end_date}\n"
             f"Reason: {leave_request.reason}\n"
         )
-        _send_leave_email(subject, message, [manager.email])
+        emails.append((subject, message, [manager.email]))
+
+    _send_leave_emails(emails)
 
 
 def notify_leave_status_changed(leave_request: LeaveRequest):
@@ -278,7 +761,7 @@ def notify_leave_status_changed(leave_request: LeaveRequest):
         f"New status: {leave_request.get_status_display()}\n"
         f"Manager comment: {leave_request.approve_comment or '-'}\n"
     )
-    _send_leave_email(subject, message, [user.email])
+    _send_leave_emails([(subject, message, [user.email])])
 
 
 
@@ -287,8 +770,11 @@ def get_employee_leave_balances(employee_profile, year=None):
     if year is None:
         year = timezone.now().year
 
-    balances = LeaveBalance.objects.select_related("leave_type").filter(
-        employee=employee_profile, year=year
+    balances = (
+        LeaveBalance.objects.with_remaining()
+        .select_related("leave_type")
+        .defer("leave_type__description")
+        .filter(employee=employee_profile, year=year)
     )
 
     return balances
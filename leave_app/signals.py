@@ -0,0 +1,39 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import EmployeeProfile, Holiday, LeaveRequest
+from .services import invalidate_ceo_dashboard_cache, invalidate_holiday_cache
+
+
+@receiver(pre_save, sender=Holiday)
+def remember_holiday_year(sender, instance, **kwargs):
+    # post_save only sees the new date; keep the old year for invalidation
+    previous = None
+    if instance.pk:
+        previous = (
+            Holiday.objects.filter(pk=instance.pk)
+            .values_list("date", flat=True)
+            .first()
+        )
+    instance._previous_year = previous.year if previous else None
+
+
+@receiver(post_save, sender=Holiday)
+def invalidate_saved_holiday(sender, instance, **kwargs):
+    years = [instance.date.year]
+    if instance._previous_year is not None:
+        years.append(instance._previous_year)
+    invalidate_holiday_cache(*years)
+
+
+@receiver(post_delete, sender=Holiday)
+def invalidate_deleted_holiday(sender, instance, **kwargs):
+    invalidate_holiday_cache(instance.date.year)
+
+
+@receiver(post_save, sender=LeaveRequest)
+@receiver(post_delete, sender=LeaveRequest)
+@receiver(post_save, sender=EmployeeProfile)
+@receiver(post_delete, sender=EmployeeProfile)
+def invalidate_ceo_dashboard(sender, instance, **kwargs):
+    invalidate_ceo_dashboard_cache()
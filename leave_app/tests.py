@@ -1,3 +1,124 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import EmployeeProfile, LeaveBalance, LeaveRequest, LeaveType
+from .services import get_holiday_dates, validate_leave_requests
+
+
+class ValidateLeaveRequestsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.year = timezone.now().year + 1
+        # First Monday of March next year, so the requests are in the future
+        first = date(cls.year, 3, 1)
+        cls.monday = first + timedelta(days=-first.weekday() % 7)
+
+        user = User.objects.create_user("emp", email="emp@example.com")
+        cls.employee = EmployeeProfile.objects.create(user=user, employee_code="E001")
+        cls.annual = LeaveType.objects.create(name="Annual", code="AL")
+        cls.sick = LeaveType.objects.create(name="Sick", code="SL")
+        LeaveBalance.objects.create(
+            employee=cls.employee,
+            leave_type=cls.annual,
+            year=cls.year,
+            allocated=Decimal("10"),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def _request(self, start_offset, days=1, leave_type=None):
+        start = self.monday + timedelta(days=start_offset)
+        return LeaveRequest(
+            employee=self.employee,
+            leave_type=leave_type or self.annual,
+            start_date=start,
+            end_date=start + timedelta(days=days - 1),
+        )
+
+    def test_valid_batch(self):
+        batch = [self._request(0), self._request(1)]
+        # Holidays come from the cache; warm it so only the batch queries count
+        get_holiday_dates(batch[0].start_date, batch[-1].end_date)
+
+        with self.assertNumQueries(3):
+            self.assertEqual(validate_leave_requests(batch), {})
+
+    def test_overlap_within_batch(self):
+        errors = validate_leave_requests(
+            [self._request(0, days=2), self._request(1), self._request(3)]
+        )
+
+        self.assertEqual(list(errors), [1])
+        self.assertIn("overlaps", errors[1].messages[0])
+
+    def test_overlap_with_stored_request(self):
+        stored = self._request(0, days=3)
+        stored.reason = "stored"
+        stored.save()
+
+        errors = validate_leave_requests([self._request(2), self._request(3)])
+        self.assertEqual(list(errors), [0])
+        self.assertIn("overlaps", errors[0].messages[0])
+
+        # A saved request does not overlap itself
+        self.assertEqual(validate_leave_requests([stored]), {})
+
+    def test_missing_balance(self):
+        errors = validate_leave_requests([self._request(0, leave_type=self.sick)])
+
+        self.assertEqual(
+            errors[0].messages,
+            [f"No leave balance for Sick in year {self.year}."],
+        )
+
+    def test_bad_leave_type_and_dates(self):
+        missing_type = self._request(0)
+        missing_type.leave_type = None
+        deleted_type = self._request(1)
+        deleted_type.leave_type_id = 999999
+        no_dates = self._request(2)
+        no_dates.start_date = None
+
+        errors = validate_leave_requests(
+            [missing_type, deleted_type, no_dates, self._request(3)]
+        )
+
+        self.assertEqual(errors[0].messages, ["Leave type is required."])
+        self.assertEqual(errors[1].messages, ["Leave type does not exist."])
+        self.assertEqual(errors[2].messages, ["Start and end dates are required."])
+        self.assertNotIn(3, errors)
+
+
+class LeaveRequestAdminTests(TestCase):
+    def test_reversed_dates_are_a_form_error(self):
+        admin_user = User.objects.create_superuser("admin", "admin@example.com", "pw")
+        user = User.objects.create_user("emp", email="emp@example.com")
+        employee = EmployeeProfile.objects.create(user=user, employee_code="E001")
+        leave_type = LeaveType.objects.create(name="Annual", code="AL")
+        self.client.force_login(admin_user)
+
+        response = self.client.post(
+            reverse("admin:leave_app_leaverequest_add"),
+            {
+                "employee": employee.pk,
+                "leave_type": leave_type.pk,
+                "start_date": "2030-03-10",
+                "end_date": "2030-03-01",
+                "reason": "Trip",
+                "status": LeaveRequest.STATUS_PENDING,
+            },
+        )
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.context["adminform"].form.errors["end_date"],
+            ["End date must be after start date."],
+        )
+        self.assertFalse(LeaveRequest.objects.exists())
@@ -2,136 +2,167 @@ import json
 from datetime import timedelta
 
 from django.contrib.auth.decorators import user_passes_test
-from django.db.models import Count
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Q, Sum
 from django.db.models.functions import TruncMonth
 from django.shortcuts import render
 from django.utils import timezone
 
 from .models import EmployeeProfile, LeaveRequest
-from .services import calculate_working_days
+from .services import CEO_DASHBOARD_CACHE_TIMEOUT, ceo_dashboard_cache_key
 
 
 def is_ceo(user):
     return user.is_superuser or user.groups.filter(name="CEO").exists()
 
 
-@user_passes_test(is_ceo)
-def ceo_dashboard(request):
-    year_param = request.GET.get("year")
-    try:
-        year = int(year_param) if year_param else timezone.now().year
-    except ValueError:
-        year = timezone.now().year
-
+def _year_summary(year):
+    """Year-bound KPIs, rankings and chart data (cached by ceo_dashboard)"""
     # Active employees
     total_employees = EmployeeProfile.objects.filter(user__is_active=True).count()
 
     # All requests in that year (all statuses)
     qs_year = LeaveRequest.objects.filter(start_date__year=year)
 
-    total_requests = qs_year.count()
-    pending_count = qs_year.filter(status=LeaveRequest.STATUS_PENDING).count()
-    approved_count = qs_year.filter(status=LeaveRequest.STATUS_APPROVED).count()
-    rejected_count = qs_year.filter(status=LeaveRequest.STATUS_REJECTED).count()
-    cancelled_count = qs_year.filter(status=LeaveRequest.STATUS_CANCELLED).count()
+    # All status counts in one round-trip
+    counts = qs_year.aggregate(
+        total=Count("id"),
+        pending=Count("id", filter=Q(status=LeaveRequest.STATUS_PENDING)),
+        approved=Count("id", filter=Q(status=LeaveRequest.STATUS_APPROVED)),
+        rejected=Count("id", filter=Q(status=LeaveRequest.STATUS_REJECTED)),
+        cancelled=Count("id", filter=Q(status=LeaveRequest.STATUS_CANCELLED)),
+        # leave_days is stored on approval, so the sum runs in the database
+        leave_days=Sum("leave_days", filter=Q(status=LeaveRequest.STATUS_APPROVED)),
+    )
 
     # ✅ Use only Approved leaves for calculating "leave days"
-    approved_qs_year = qs_year.filter(
-        status=LeaveRequest.STATUS_APPROVED
-    ).select_related("employee__user", "employee__department", "leave_type")
+    approved_qs_year = qs_year.filter(status=LeaveRequest.STATUS_APPROVED)
 
     # ---------- KPI: total & average leave days ----------
-    total_leave_days = 0.0
-
-    # For department / employee ranking
-    dept_days: dict[str, float] = {}
-    emp_days: dict[EmployeeProfile, float] = {}
-
-    for leave in approved_qs_year:
-        days = float(
-            calculate_working_days(
-                leave.start_date,
-                leave.end_date,
-                leave.half_day,
-            )
-        )
-        total_leave_days += days
-
-        # Sum leave days by department
-        dept_name = (
-            leave.employee.department.name if leave.employee.department else "No Dept"
-        )
-        dept_days[dept_name] = dept_days.get(dept_name, 0.0) + days
-
-        # Sum leave days by employee
-        emp = leave.employee
-        emp_days[emp] = emp_days.get(emp, 0.0) + days
+    total_leave_days = float(counts["leave_days"] or 0)
 
     avg_leave_days_per_employee = (
         total_leave_days / total_employees if total_employees else 0.0
     )
 
     # ---------- Top Departments (by leave days) ----------
-    top_departments = sorted(
-        dept_days.items(),
-        key=lambda x: x[1],
-        reverse=True,
-    )[:5]
-
-    top_departments = [{"name": name, "days": days} for name, days in top_departments]
+    top_departments = [
+        {
+            "name": row["employee__department__name"] or "No Dept",
+            "days": float(row["days"] or 0),
+        }
+        for row in approved_qs_year.values(
+            "employee__department_id", "employee__department__name"
+        )
+        .annotate(days=Sum("leave_days"))
+        .order_by("-days")[:5]
+    ]
 
     # ---------- Top Employees (by leave days) ----------
-    top_employees_raw = sorted(
-        emp_days.items(),
-        key=lambda x: x[1],
-        reverse=True,
-    )[:5]
-
     top_employees = []
-    for emp, days in top_employees_raw:
-        user = emp.user
+    for row in (
+        approved_qs_year.values(
+            "employee_id",
+            "employee__employee_code",
+            "employee__user__username",
+            "employee__user__first_name",
+            "employee__user__last_name",
+            "employee__department__name",
+        )
+        .annotate(days=Sum("leave_days"))
+        .order_by("-days")[:5]
+    ):
+        full_name = (
+            f"{row['employee__user__first_name']} {row['employee__user__last_name']}"
+        ).strip()
         top_employees.append(
             {
-                "employee": emp,
-                "code": emp.employee_code,
-                "name": user.get_full_name() or user.username,
-                "department": emp.department.name if emp.department else "-",
-                "days": days,
+                "code": row["employee__employee_code"],
+                "name": full_name or row["employee__user__username"],
+                "department": row["employee__department__name"] or "-",
+                "days": float(row["days"] or 0),
             }
         )
 
     # ---------- Chart: Number of leave requests per month ----------
-    monthly_qs = (
+    # Each chart query is fetched once as (label, count) tuples
+    monthly = list(
         qs_year.annotate(month=TruncMonth("start_date"))
         .values("month")
         .annotate(count=Count("id"))
         .order_by("month")
+        .values_list("month", "count")
     )
 
-    monthly_labels = [item["month"].strftime("%b") for item in monthly_qs]
-    monthly_counts = [item["count"] for item in monthly_qs]
+    monthly_labels = [month.strftime("%b") for month, _ in monthly]
+    monthly_counts = [count for _, count in monthly]
 
     # ---------- Chart by department ----------
-    dept_qs = (
+    by_department = list(
         qs_year.values("employee__department__name")
         .annotate(count=Count("id"))
         .order_by("-count")
+        .values_list("employee__department__name", "count")
     )
 
-    department_labels = [
-        (item["employee__department__name"] or "No Dept") for item in dept_qs
-    ]
-    department_counts = [item["count"] for item in dept_qs]
+    department_labels = [name or "No Dept" for name, _ in by_department]
+    department_counts = [count for _, count in by_department]
 
     # ---------- Chart by leave type ----------
-    type_qs = (
+    by_leave_type = list(
         qs_year.values("leave_type__name")
         .annotate(count=Count("id"))
         .order_by("-count")
+        .values_list("leave_type__name", "count")
     )
 
-    leave_type_labels = [item["leave_type__name"] for item in type_qs]
-    leave_type_counts = [item["count"] for item in type_qs]
+    leave_type_labels = [name for name, _ in by_leave_type]
+    leave_type_counts = [count for _, count in by_leave_type]
+
+    return {
+        "year": year,
+        "total_employees": total_employees,
+        "total_requests": counts["total"],
+        "pending_count": counts["pending"],
+        "approved_count": counts["approved"],
+        "rejected_count": counts["rejected"],
+        "cancelled_count": counts["cancelled"],
+        "total_leave_days": total_leave_days,
+        "avg_leave_days_per_employee": avg_leave_days_per_employee,
+        "top_departments": top_departments,
+        "top_employees": top_employees,
+        # All chart data serialised once for the template's JSON.parse
+        "charts_json": json.dumps(
+            {
+                "monthly": {"labels": monthly_labels, "counts": monthly_counts},
+                "department": {
+                    "labels": department_labels,
+                    "counts": department_counts,
+                },
+                "leave_type": {
+                    "labels": leave_type_labels,
+                    "counts": leave_type_counts,
+                },
+            },
+            cls=DjangoJSONEncoder,
+        ),
+    }
+
+
+@user_passes_test(is_ceo)
+def ceo_dashboard(request):
+    year_param = request.GET.get("year")
+    try:
+        year = int(year_param) if year_param else timezone.now().year
+    except ValueError:
+        year = timezone.now().year
+
+    cache_key = ceo_dashboard_cache_key(year)
+    context = cache.get(cache_key)
+    if context is None:
+        context = _year_summary(year)
+        cache.set(cache_key, context, CEO_DASHBOARD_CACHE_TIMEOUT)
 
     # ✅ Upcoming leave table (today + next 7 days), Approved only
     today = timezone.now().date()
@@ -147,26 +178,17 @@ def ceo_dashboard(request):
             end_date__gte=today,
         )
         .order_by("start_date", "employee__department__name")
+        # Only the columns the schedule table renders
+        .only(
+            "start_date",
+            "end_date",
+            "leave_type__name",
+            "employee__user__username",
+            "employee__user__first_name",
+            "employee__user__last_name",
+            "employee__department__name",
+        )
     )
 
-    context = {
-        "year": year,
-        "total_employees": total_employees,
-        "total_requests": total_requests,
-        "pending_count": pending_count,
-        "approved_count": approved_count,
-        "rejected_count": rejected_count,
-        "cancelled_count": cancelled_count,
-        "total_leave_days": total_leave_days,
-        "avg_leave_days_per_employee": avg_leave_days_per_employee,
-        "top_departments": top_departments,
-        "top_employees": top_employees,
-        "monthly_labels_json": json.dumps(monthly_labels),
-        "monthly_counts_json": json.dumps(monthly_counts),
-        "department_labels_json": json.dumps(department_labels),
-        "department_counts_json": json.dumps(department_counts),
-        "leave_type_labels_json": json.dumps(leave_type_labels),
-        "leave_type_counts_json": json.dumps(leave_type_counts),
-        "upcoming_leaves": upcoming_leaves,
-    }
+    context["upcoming_leaves"] = upcoming_leaves
     return render(request, "leave_app/ceo/ceo_dashboard.html", context)
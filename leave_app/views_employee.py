@@ -1,5 +1,6 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 
@@ -8,6 +9,11 @@ from .models import EmployeeProfile, LeaveBalance, LeaveRequest
 from .services import notify_leave_submitted, get_employee_leave_balances
 
 
+def _is_overlap_violation(error):
+    diag = getattr(error.__cause__, "diag", None)
+    return getattr(diag, "constraint_name", None) == "lr_no_overlap"
+
+
 @login_required
 def dashboard(request):
     profile = get_object_or_404(EmployeeProfile, user=request.user)
@@ -15,9 +21,11 @@ def dashboard(request):
     recent_leaves = LeaveRequest.objects.filter(employee=profile)[:5]
 
     current_year = timezone.now().year
-    balances = LeaveBalance.objects.filter(
-        employee=profile, year=current_year
-    ).select_related("leave_type")
+    balances = (
+        LeaveBalance.objects.with_remaining()
+        .filter(employee=profile, year=current_year)
+        .select_related("leave_type")
+    )
 
     context = {
         "profile": profile,
@@ -49,9 +57,17 @@ def leave_request_create(request):
         if form.is_valid():
             leave = form.save(commit=False)
             leave.employee = employee
-            leave.save()
-            messages.success(request, "Leave request submitted successfully")
-            return redirect("leave_app:leave_request_list")
+            try:
+                with transaction.atomic():
+                    leave.save()
+            except IntegrityError as e:
+                # A concurrent request slipped past validation
+                if not _is_overlap_violation(e):
+                    raise
+                form.add_error(None, "Leave request overlaps with existing leave.")
+            else:
+                messages.success(request, "Leave request submitted successfully")
+                return redirect("leave_app:leave_request_list")
     else:
         form = LeaveRequestForm(employee_profile=employee)
 
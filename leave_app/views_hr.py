@@ -8,6 +8,7 @@ from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import user_passes_test
 from django.contrib.sessions.models import Session
+from django.db import IntegrityError
 from django.db.models import Q
 from django.forms import modelformset_factory
 from django.http import HttpResponse
@@ -23,7 +24,7 @@ from .forms import (
     LeaveBalanceForm,
 )
 from .models import Department, EmployeeProfile, LeaveBalance, LeaveRequest, LeaveType
-from .services import create_default_leave_balances
+from .services import create_default_leave_balances, import_employee_rows
 
 User = get_user_model()
 
@@ -51,7 +52,7 @@ def hr_leave_dashboard(request):
         "leaves": qs,
         "statuses": LeaveRequest.STATUS_CHOICES,
         "departments": Department.objects.all(),
-        "leave_types": LeaveType.objects.all(),
+        "leave_types": LeaveType.objects.defer("description"),
         "employees": EmployeeProfile.objects.select_related("user").all(),
         "filter_status": status,
         "filter_department": department_id,
@@ -191,7 +192,8 @@ def hr_employee_import(request):
         if form.is_valid():
             file = form.cleaned_data["file"]
             try:
-                wb = openpyxl.load_workbook(file)
+                # read_only streams rows instead of building the whole sheet in memory
+                wb = openpyxl.load_workbook(file, read_only=True, data_only=True)
             except BadZipFile:
                 messages.error(
                     request,
@@ -200,44 +202,20 @@ def hr_employee_import(request):
                 return redirect("leave_app:hr_employee_import")
 
             ws = wb.active
-            created_count = 0
-
-            for idx, row in enumerate(
-                ws.iter_rows(min_row=2, values_only=True), start=2
-            ):
-                username, password, employee_code, dept_code, manager_username = row[:5]
-                if not username:
-                    continue
-
-                user, user_created = User.objects.get_or_create(username=username)
-                if user_created:
-                    user.set_password(password or username)
-                    user.save()
-
-                department = None
-                if dept_code:
-                    department, _ = Department.objects.get_or_create(
-                        code=str(dept_code),
-                        defaults={"name": str(dept_code)},
-                    )
-
-                manager = None
-                if manager_username:
-                    manager = User.objects.filter(
-                        username=str(manager_username)
-                    ).first()
-
-                profile, prof_created = EmployeeProfile.objects.get_or_create(
-                    user=user,
-                    defaults={
-                        "employee_code": employee_code or f"EMP{user.id:04d}",
-                        "department": department,
-                        "manager": manager,
-                    },
-                )
+            rows = [
+                (tuple(row) + (None,) * 5)[:5]
+                for row in ws.iter_rows(min_row=2, values_only=True)
+            ]
+            wb.close()
 
-                create_default_leave_balances(profile)
-                created_count += 1
+            try:
+                created_count = import_employee_rows(rows)
+            except IntegrityError:
+                messages.error(
+                    request,
+                    "Import failed: duplicate employee code in the file or database.",
+                )
+                return redirect("leave_app:hr_employee_import")
 
             messages.success(
                 request, f"Successfully imported {created_count} employees"
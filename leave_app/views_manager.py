@@ -19,12 +19,12 @@ def manager_leave_list(request):
     pending_leaves = LeaveRequest.objects.filter(
         employee__in=subordinates,
         status=LeaveRequest.STATUS_PENDING,
-    ).select_related("employee", "leave_type")
+    ).select_related("employee__user", "leave_type")
 
     history_leaves = (
         LeaveRequest.objects.filter(employee__in=subordinates)
         .exclude(status=LeaveRequest.STATUS_PENDING)
-        .select_related("employee", "leave_type", "approver")
+        .select_related("employee__user", "leave_type", "approver")
         .order_by("-updated_at")
     )
 
@@ -38,11 +38,16 @@ def manager_leave_list(request):
 @user_passes_test(is_manager)
 def manager_leave_detail(request, pk):
     leave_req = get_object_or_404(
-        LeaveRequest.objects.select_related("employee", "leave_type"),
+        LeaveRequest.objects.select_related(
+            "employee__user", "employee__department", "leave_type"
+        ),
         pk=pk,
     )
 
-    if leave_req.employee.manager != request.user and not request.user.is_superuser:
+    if (
+        leave_req.employee.manager_id != request.user.pk
+        and not request.user.is_superuser
+    ):
         return HttpResponseForbidden("You do not have permission to view this request")
 
     if request.method == "POST":